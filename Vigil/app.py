@@ -3,34 +3,124 @@ Workspace Panel - Left pane companion for Claude Code workflow
 Run in left Windows Terminal pane, Claude Code in right panes
 """
 
+import asyncio
+import hashlib
 import os
-import subprocess
+import re
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from queue import Queue, Empty
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple
 
+from rich.style import Style
+from rich.text import Text
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 
 from textual.app import App, ComposeResult
 from textual.message import Message
-from textual.containers import Vertical, Horizontal, VerticalScroll
+from textual.containers import Vertical, Horizontal
 from textual.widgets import (
     DirectoryTree, Static, Button, RichLog, Select,
     TabbedContent, TabPane, ListView, ListItem, Label,
 )
 from textual.binding import Binding
+from textual.widgets.tree import TreeNode
+from textual.timer import Timer
+from textual.worker import Worker
 
-from services.git import get_git_diff, get_git_staged
-from services.lm_studio import LMStudioClient
-from services.mcp_client import McpClient
+from services import clipboard, fastjson
+from services.git import decode_git_output, get_git_diff_raw, get_git_staged_raw
+
+# Service clients are imported where they're built, to keep startup light
+if TYPE_CHECKING:
+    from services.lm_studio import LMStudioClient
 
 
 # --- Configuration ---
 
 STARTING_PATH = "C:/dev/SENTINEL"  # Override with command line arg later
-FILE_POLL_INTERVAL = 0.5  # seconds - just draining watchdog queue now
+FILE_EVENT_COALESCE = 0.2  # seconds to let a burst of file events settle before reacting
+TREE_RELOAD_DEBOUNCE = 0.5  # seconds - tree reloads wait for this much quiet after the last change
+IGNORED_DIRS = frozenset({  # directory names whose contents skip tree reloads and reviews
+    ".git", "node_modules", "__pycache__", ".venv", "venv", ".mypy_cache",
+    ".pytest_cache", "target", "build", "dist", ".next",
+})
+TREE_PARTIAL_RELOAD_MAX = 50  # changed directories beyond which one full tree reload is cheaper
 SHADOW_REVIEW_COOLDOWN = 10.0  # seconds between auto-reviews
+MODEL_POLL_BACKOFF = (2.0, 5.0, 15.0, 60.0)  # seconds - model poll steps while LM Studio is offline
+MODEL_POLL_CONNECTED = 30.0  # seconds between model polls while LM Studio is up
+MODEL_REFRESH_DEBOUNCE = 0.5  # seconds - repeat forced refreshes inside this window are dropped
+MODEL_OPTIONS_CACHE_SIZE = 8  # distinct model lists whose Select options are kept
+OUTPUT_REDRAW_INTERVAL = 0.05  # seconds - streamed replies repaint at most this often
+OUTPUT_MAX_LINES = 2000  # model output keeps only the newest lines
+GIT_CACHE_TTL = 2.0  # seconds a diff is reused when .git/index can't be stat'd
+RESOURCE_CACHE_TTL = 30.0  # seconds an Inspector resource is reused before refetching
+RESOURCE_CACHE_SIZE = 64  # max cached Inspector resources
+RESOURCE_MAX_LINES = 5000  # Inspector stops rendering a resource after this many lines
+RESOURCE_WRITE_CHUNK = 200  # lines written between repaints while rendering a resource
+RESOURCE_STYLE = Style(color="#58a6ff")  # Inspector resource names
+
+
+# --- JSON ---
+
+_JSON_START = re.compile(r"\s*[\[{]")
+
+
+def _reformat(raw: str) -> str:
+    """Pretty-print JSON content, or return it unchanged if it isn't JSON."""
+    # Skip the parse (and its exception) for text that can't be an object/array
+    if not _JSON_START.match(raw):
+        return raw
+    try:
+        return fastjson.dumps_pretty(fastjson.loads(raw))
+    except Exception:
+        return raw
+
+
+def _render_lines(raw: str) -> list[str]:
+    """Resource content as the lines the Inspector writes."""
+    return _reformat(raw).splitlines()
+
+
+# --- Model Buttons ---
+
+async def _no_context(panel: "ModelPanel") -> str:
+    return ""
+
+
+async def _diff_context(panel: "ModelPanel") -> str:
+    return await panel._cached_diff()
+
+
+async def _staged_context(panel: "ModelPanel") -> str:
+    return await panel._cached_staged()
+
+
+async def _commit_context(panel: "ModelPanel") -> str:
+    """Staged changes, or the unstaged diff if nothing is staged."""
+    staged = await panel._cached_staged()
+    if staged == "(nothing staged)":
+        return await panel._cached_diff()
+    return staged
+
+
+# Button id -> (prompt, context getter)
+_BUTTON_DISPATCH = MappingProxyType({
+    "btn-ping": ("Reply with exactly: pong", _no_context),
+    "btn-diff": ("Explain what this diff does. Be concise.", _diff_context),
+    "btn-staged": ("Summarize these staged changes. What's the intent?", _staged_context),
+    "btn-commit": (
+        "Suggest a commit message for these changes. Just the message, no explanation.",
+        _commit_context,
+    ),
+})
+
+# Shadow review verdict: the reply must open with its tag (markdown emphasis allowed)
+_TAG_RE = re.compile(r"^[\s*_]*\[(SAFE|WARNING|CRITICAL)\]", re.IGNORECASE)
 
 
 # --- File Watcher ---
@@ -38,68 +128,145 @@ SHADOW_REVIEW_COOLDOWN = 10.0  # seconds between auto-reviews
 class _WatchdogHandler(FileSystemEventHandler):
     """Collects file system events into a queue."""
 
-    def __init__(self, queue: Queue, root_path: Path):
+    def __init__(self, queue: Queue, root_path: Path, notify, ignore_dirs: frozenset[str]):
         super().__init__()
         self.queue = queue
         self.root_path = root_path
+        self.notify = notify  # Called (on the observer thread) after each queued event
+        self.ignore_dirs = ignore_dirs
+        self._root_len = len(str(root_path).rstrip("/\\"))  # keep the separator after a drive/root
+        # Event paths are the watched root joined with os.sep-separated parts,
+        # so "<sep>name<sep>" below the root only matches a whole directory name
+        sep = re.escape(os.sep)
+        names = "|".join(re.escape(name) for name in sorted(ignore_dirs))
+        self._ignored = re.compile(f"{sep}(?:{names}){sep}") if ignore_dirs else None
+        # Set when an ignored path changes - it may still be tracked by git
+        self.ignored_dirty = False
 
     def _should_ignore(self, path: str) -> bool:
-        """Ignore .git and other noise."""
-        return ".git" in path or "__pycache__" in path
+        """Ignore anything under .git, build output and other noise directories."""
+        if self._ignored is None:
+            return False
+        return self._ignored.search(path, self._root_len) is not None
+
+    def _push(self, event_type: str, path: str) -> None:
+        if self._should_ignore(path):
+            self.ignored_dirty = True
+        else:
+            self.queue.put((event_type, path))
+        self.notify()
 
     def on_created(self, event: FileSystemEvent) -> None:
-        if not event.is_directory and not self._should_ignore(event.src_path):
-            self.queue.put(("created", Path(event.src_path)))
+        if not event.is_directory:
+            self._push("created", event.src_path)
 
     def on_modified(self, event: FileSystemEvent) -> None:
-        if not event.is_directory and not self._should_ignore(event.src_path):
-            self.queue.put(("modified", Path(event.src_path)))
+        if not event.is_directory:
+            self._push("modified", event.src_path)
 
     def on_deleted(self, event: FileSystemEvent) -> None:
-        if not event.is_directory and not self._should_ignore(event.src_path):
-            self.queue.put(("deleted", Path(event.src_path)))
+        if not event.is_directory:
+            self._push("deleted", event.src_path)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        """A rename removes the old path and adds the new one."""
+        if not event.is_directory:
+            self._push("deleted", event.src_path)
+            self._push("created", event.dest_path)
 
 
 class FileWatcher:
     """Watches a directory for file changes using watchdog."""
 
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, ignore_dirs: frozenset[str] = IGNORED_DIRS):
         self.root_path = Path(root_path)
         self._queue: Queue = Queue()
+        self._wake = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._notified = False
         self._observer = Observer()
-        self._handler = _WatchdogHandler(self._queue, self.root_path)
-        self._observer.schedule(self._handler, str(self.root_path), recursive=True)
-        self._observer.start()
+        self._handler = _WatchdogHandler(self._queue, self.root_path, self._notify, ignore_dirs)
+        self._lock = threading.Lock()  # start() runs on a worker thread
+        self._stopped = False
+
+    def start(self) -> None:
+        """Start watching. Sets up watches for every directory, so run it off the UI thread."""
+        with self._lock:
+            if self._stopped or self._observer.is_alive():
+                return
+            self._observer.schedule(self._handler, str(self.root_path), recursive=True)
+            self._observer.start()
+
+    def _notify(self) -> None:
+        """Wake wait_for_changes (observer thread). One wake-up per drain is enough."""
+        if self._loop is not None and not self._notified:
+            self._notified = True
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def wait_for_changes(self) -> None:
+        """Sleep until the observer has queued at least one event."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        while self._queue.empty() and not self._handler.ignored_dirty:
+            await self._wake.wait()
+            self._wake.clear()
 
     def stop(self) -> None:
         """Stop the observer thread."""
-        self._observer.stop()
-        self._observer.join()
+        with self._lock:
+            self._stopped = True
+            if self._observer.is_alive():
+                self._observer.stop()
+                self._observer.join()
 
-    def check_for_changes(self) -> tuple[bool, list[Path], list[Path], list[Path]]:
+    def check_for_changes(self) -> tuple[bool, list[str], list[str], list[str]]:
         """
         Drain the event queue and return changes.
         Returns: (changed, added, modified, deleted)
+
+        Paths are plain strings; callers that need a Path build one themselves.
         """
-        added = []
-        modified = []
-        deleted = []
+        self._notified = False  # Events queued from here on need a fresh wake-up
 
+        # Fold each path's events into one net change: editors emit bursts of
+        # modified events, and temp files are created and deleted in one save.
+        changes: dict[str, str] = {}
         while True:
             try:
                 event_type, path = self._queue.get_nowait()
-                if event_type == "created":
-                    added.append(path)
-                elif event_type == "modified":
-                    modified.append(path)
-                elif event_type == "deleted":
-                    deleted.append(path)
             except Empty:
                 break
+            previous = changes.get(path)
+            if previous == "created":
+                if event_type == "deleted":
+                    del changes[path]  # Came and went between drains
+                continue  # Still a new file
+            if previous == "deleted" and event_type == "created":
+                changes[path] = "modified"  # Replaced in place (atomic save)
+                continue
+            changes[path] = event_type
+
+        added = []
+        modified = []
+        deleted = []
+        for path, event_type in changes.items():
+            if event_type == "created":
+                added.append(path)
+            elif event_type == "modified":
+                modified.append(path)
+            elif event_type == "deleted":
+                deleted.append(path)
 
         changed = bool(added or modified or deleted)
         return changed, added, modified, deleted
 
+    def take_ignored_change(self) -> bool:
+        """Return whether anything under an ignored directory changed since the last call."""
+        if not self._handler.ignored_dirty:
+            return False
+        self._handler.ignored_dirty = False
+        return True
+
 
 # --- Widgets ---
 
@@ -109,6 +276,17 @@ class ModelSelector(Horizontal):
     def __init__(self):
         super().__init__()
         self.selected_model = None
+        self._poll_step = 0
+        self._visible = asyncio.Event()
+        self._last_models_tuple: tuple[str, ...] = ()
+        self._last_indicator_color: str | None = None
+        self._options_cache: dict[tuple[str, ...], tuple[tuple[str, str], ...]] = {}
+        self._last_refresh_ts = 0.0  # last forced refresh
+        self._inflight: asyncio.Task | None = None
+        self._inflight_forced = False
+        self._last_status_key: tuple[bool, int, str | None] | None = None
+        self._select: Select | None = None
+        self._indicator: Static | None = None
 
     def compose(self) -> ComposeResult:
         yield Static("", id="status-indicator")
@@ -116,14 +294,61 @@ class ModelSelector(Horizontal):
         yield Button("↻", id="btn-refresh-models", variant="default")
 
     async def on_mount(self) -> None:
+        self._select = self.query_one("#model-select", Select)
+        self._indicator = self.query_one("#status-indicator", Static)
         await self.refresh_models(force=True)
-        self.set_interval(2.0, self.refresh_models)
+        self._visible.set()
+        # A worker, so it's cancelled with the widget and its errors surface
+        self.run_worker(self._poll_models(), exclusive=True, group="model-poll")
+
+    def on_show(self) -> None:
+        self._visible.set()
+
+    def on_hide(self) -> None:
+        self._visible.clear()
+
+    async def _poll_models(self) -> None:
+        """Poll LM Studio for models: slowly while it's up, backing off while it's offline."""
+        while True:
+            if self.app.lmstudio.connected:
+                await asyncio.sleep(MODEL_POLL_CONNECTED)
+            else:
+                await asyncio.sleep(MODEL_POLL_BACKOFF[self._poll_step])
+            await self._visible.wait()
+            # The client caches failed probes for its TTL too, so an offline
+            # poll has to force one or the short backoff steps never hit the wire
+            await self.refresh_models(force=not self.app.lmstudio.connected)
+            if self.app.lmstudio.connected:
+                self._poll_step = 0
+            else:
+                self._poll_step = min(self._poll_step + 1, len(MODEL_POLL_BACKOFF) - 1)
+
+    def _options_for(self, models: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+        """Return Select options for a model list, reusing ones built before."""
+        options = self._options_cache.get(models)
+        if options is None:
+            options = tuple((m, m) for m in models)
+            if len(self._options_cache) >= MODEL_OPTIONS_CACHE_SIZE:
+                del self._options_cache[next(iter(self._options_cache))]
+            self._options_cache[models] = options
+        return options
+
+    def _set_indicator(self, color: str) -> None:
+        if self._indicator is None or color == self._last_indicator_color:
+            return
+        self._indicator.update(f"[{color}]●[/]")
+        self._last_indicator_color = color
 
     def _update_status_text(self, *, connected: bool, models_count: int, error: str | None) -> None:
+        key = (connected, models_count, error)
+        if key == self._last_status_key:
+            return
+
         try:
             status = self.app.query_one("#lm-status", Static)
         except Exception:
             return
+        self._last_status_key = key
 
         if connected:
             status.update(f"[green]LM Studio connected[/] ([dim]{models_count} models[/])")
@@ -133,27 +358,57 @@ class ModelSelector(Horizontal):
 
     async def refresh_models(self, *, force: bool = False) -> None:
         """Fetch and populate available models."""
-        client: LMStudioClient = self.app.lmstudio
-        select = self.query_one("#model-select", Select)
-        indicator = self.query_one("#status-indicator", Static)
+        # Join a refresh already in flight rather than starting another. An
+        # unforced one may only have read the client's cache, so a forced
+        # caller still runs its own probe once it finishes.
+        while self._inflight is not None and not self._inflight.done():
+            inflight, inflight_forced = self._inflight, self._inflight_forced
+            await asyncio.shield(inflight)
+            if inflight_forced or not force:
+                return
+        if force:
+            # Only forced refreshes hit the network for sure, so only they debounce
+            now = time.monotonic()
+            if now - self._last_refresh_ts < MODEL_REFRESH_DEBOUNCE:
+                return
+            self._last_refresh_ts = now
+        self._inflight_forced = force
+        self._inflight = asyncio.create_task(self._do_refresh(force=force))
+        await asyncio.shield(self._inflight)
+
+    async def _do_refresh(self, *, force: bool) -> None:
+        select = self._select
+        if select is None:
+            return
+        client: "LMStudioClient" = self.app.lmstudio
 
         models = await client.refresh_models(force=force)
 
-        if client.connected:
-            select.set_options([(m, m) for m in models])
-            if models:
-                if self.selected_model not in models:
-                    self.selected_model = models[0]
-                select.value = self.selected_model
+        # These assignments mirror state we already hold; don't let the
+        # resulting Select.Changed messages bounce back into on_select_changed
+        with self.prevent(Select.Changed):
+            if client.connected:
+                if models != self._last_models_tuple:
+                    select.set_options(self._options_for(models))
+                    self._last_models_tuple = models
+                if models:
+                    if self.selected_model not in models:
+                        self.selected_model = models[0]
+                    if select.value != self.selected_model:
+                        select.value = self.selected_model
+                else:
+                    self.selected_model = None
+                    if select.value != Select.BLANK:
+                        select.value = Select.BLANK
+                self._set_indicator("green")
             else:
+                if self._last_models_tuple:
+                    select.set_options([])
+                    self._last_models_tuple = ()
                 self.selected_model = None
-                select.value = Select.BLANK
-            indicator.update("[green]●[/]")
-        else:
-            select.set_options([])
-            self.selected_model = None
-            select.value = Select.BLANK
-            indicator.update("[red]●[/]")
+                if select.value != Select.BLANK:
+                    select.value = Select.BLANK
+                self._set_indicator("red")
 
         self._update_status_text(
             connected=client.connected,
@@ -177,55 +432,92 @@ class InspectorPanel(Vertical):
 
     def __init__(self):
         super().__init__()
-        self.mcp = McpClient()
+        self.mcp = None  # Shared app-wide client, resolved in compose
+        self._servers: list[str] = []
         self.current_server = None
         self.resources = []
+        # server -> worker listing its resources, so concurrent loads share one request
+        self._resource_lists: dict[str, Worker] = {}
+        # (server, uri) -> (fetched at, pretty-printed lines), in LRU order
+        self._resource_cache: OrderedDict[tuple[str, str], tuple[float, list[str]]] = OrderedDict()
+        self._list_view: ListView | None = None
+        self._content: RichLog | None = None
 
     def compose(self) -> ComposeResult:
-        servers = self.mcp.get_server_names()
-        if servers:
-            options = [(s, s) for s in servers]
-            yield Select(options, prompt="Select server", id="server-select", value=servers[0])
+        self.mcp = self.app.mcp
+        self._servers = self.mcp.get_server_names()
+        if self._servers:
+            options = [(s, s) for s in self._servers]
+            yield Select(options, prompt="Select server", id="server-select", value=self._servers[0])
         else:
             yield Static("[dim]No MCP servers configured[/]", id="no-servers")
         yield ListView(id="resource-list")
-        yield VerticalScroll(
-            Static("", id="resource-content"),
-            id="resource-scroll",
-        )
+        yield RichLog(id="resource-content", wrap=True)
 
     async def on_mount(self) -> None:
-        servers = self.mcp.get_server_names()
-        if servers:
-            self.current_server = servers[0]
+        self._list_view = self.query_one("#resource-list", ListView)
+        self._content = self.query_one("#resource-content", RichLog)
+        if self._servers:
+            self.current_server = self._servers[0]
+            self._prewarm()
             await self.load_resources()
 
+    def _prewarm(self) -> None:
+        """Start listing every server's resources concurrently."""
+        for server in self._servers:
+            self._listing(server)
+
+    def _listing(self, server: str) -> Worker:
+        """Return the in-flight listing for a server, or start one (McpClient caches the result)."""
+        worker = self._resource_lists.get(server)
+        if worker is None or worker.is_finished:
+            worker = self.run_worker(self.mcp.list_resources(server), group="resource-list")
+            self._resource_lists[server] = worker
+        return worker
+
     async def load_resources(self) -> None:
         """Load resources from the current server."""
-        if not self.current_server:
+        list_view = self._list_view
+        if not self.current_server or list_view is None:
             return
 
-        list_view = self.query_one("#resource-list", ListView)
         list_view.clear()
 
-        content = self.query_one("#resource-content", Static)
-        content.update("[dim]Loading resources...[/]")
-
-        self.resources = await self.mcp.list_resources(self.current_server)
+        # Reuse the prewarmed (or in-flight) listing
+        worker = self._listing(self.current_server)
+        if not worker.is_finished:
+            self._show_status("[dim]Loading resources...[/]")
+        # Shielded: a cancelled load mustn't cancel a listing others may share
+        self.resources = await asyncio.shield(worker.wait())
 
         if self.resources:
-            for r in self.resources:
-                item = ListItem(Label(f"[#58a6ff]{r.name}[/]"))
-                item.resource_uri = r.uri  # Store URI on the item
-                list_view.append(item)
-            content.update(f"[dim]{len(self.resources)} resources available[/]")
+            # One mount for the whole list instead of a layout pass per item
+            await list_view.extend([self._make_item(r) for r in self.resources])
+            self._show_status(f"[dim]{len(self.resources)} resources available[/]")
         else:
-            content.update("[yellow]No resources found (is the server running?)[/]")
+            self._show_status("[yellow]No resources found (is the server running?)[/]")
+
+    def _show_status(self, message: str) -> None:
+        """Replace the content pane with a single markup status line."""
+        content = self._content
+        if content is None:
+            return
+        content.clear()
+        content.write(Text.from_markup(message))
+
+    @staticmethod
+    def _make_item(resource) -> ListItem:
+        # A prebuilt Text skips Rich's markup parser (and keeps "[" in names literal)
+        item = ListItem(Label(Text(resource.name, style=RESOURCE_STYLE), markup=False))
+        item.resource_uri = resource.uri  # Store URI on the item
+        return item
 
     async def on_select_changed(self, event: Select.Changed) -> None:
         """Handle server selection change."""
         if event.select.id == "server-select" and event.value != Select.BLANK:
             self.current_server = event.value
+            for key in [k for k in self._resource_cache if k[0] != self.current_server]:
+                del self._resource_cache[key]
             await self.load_resources()
 
     async def on_list_view_selected(self, event: ListView.Selected) -> None:
@@ -233,21 +525,57 @@ class InspectorPanel(Vertical):
         if not hasattr(event.item, 'resource_uri'):
             return
 
-        uri = event.item.resource_uri
-        content = self.query_one("#resource-content", Static)
-        content.update("[dim]Loading...[/]")
+        # Only the latest click matters - exclusive drops any resource still loading
+        self.run_worker(self._show_resource(event.item.resource_uri), exclusive=True, group="resource")
+
+    async def _show_resource(self, uri: str) -> None:
+        """Fetch a resource and render it, pretty-printing off the event loop."""
+        key = (self.current_server, uri)
+
+        cached = self._resource_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < RESOURCE_CACHE_TTL:
+            self._resource_cache.move_to_end(key)
+            await self._write_resource(cached[1])
+            return
+
+        self._show_status("[dim]Loading...[/]")
 
         result = await self.mcp.read_resource(self.current_server, uri)
+        # Parse, pretty-print and split once, off the event loop; repeats reuse the lines
+        lines = await asyncio.to_thread(_render_lines, result)
 
-        # Try to pretty-format JSON
-        try:
-            import json
-            data = json.loads(result)
-            result = json.dumps(data, indent=2)
-        except Exception:
-            pass
+        if not result.startswith(("Error reading resource:", "Server not found:")):
+            self._resource_cache[key] = (time.monotonic(), lines)
+            self._resource_cache.move_to_end(key)
+            if len(self._resource_cache) > RESOURCE_CACHE_SIZE:
+                self._resource_cache.popitem(last=False)
+
+        await self._write_resource(lines)
+
+    async def _write_resource(self, lines: list[str]) -> None:
+        """Write resource lines in chunks so the UI keeps repainting."""
+        content = self._content
+        if content is None:
+            return
+        content.clear()
 
-        content.update(result)
+        for i, line in enumerate(lines[:RESOURCE_MAX_LINES], 1):
+            content.write(line)
+            if i % RESOURCE_WRITE_CHUNK == 0:
+                await asyncio.sleep(0)
+
+        if len(lines) > RESOURCE_MAX_LINES:
+            hidden = len(lines) - RESOURCE_MAX_LINES
+            content.write(Text.from_markup(f"[dim]… truncated, {hidden} more lines[/]"))
+
+
+class _GitCacheEntry(NamedTuple):
+    """Cached output of one git command."""
+
+    stamp: tuple[int, int] | None  # (.git/index, .git/HEAD) mtimes; None = stale or unknown
+    fetched_at: float
+    output: str
+    digest: bytes  # of git's raw bytes
 
 
 class ModelPanel(Vertical):
@@ -264,8 +592,15 @@ class ModelPanel(Vertical):
         super().__init__()
         self.last_output = ""
         self.shadow_enabled = False
-        self._last_diff_hash: int = 0
+        self._last_diff_digest: tuple[str, bytes] | None = None
         self._reviewing = False
+        self._query_worker: Worker | None = None
+        self._query_key: tuple[str, str] | None = None
+        self._git_cache: dict[str, _GitCacheEntry] = {}  # "diff"/"staged" -> entry
+        self._git_cwd: str | None = None  # the watched project; git runs there
+        self._git_dir: Path | None = None  # its .git, when index/HEAD stamps can be trusted
+        self._output: RichLog | None = None
+        self._selector: ModelSelector | None = None
 
     def compose(self) -> ComposeResult:
         yield ModelSelector()
@@ -281,7 +616,17 @@ class ModelPanel(Vertical):
             Static("[dim]off[/]", id="shadow-status"),
             id="button-row"
         )
-        yield RichLog(id="model-output", wrap=True, highlight=True)
+        yield RichLog(id="model-output", wrap=True, highlight=True, max_lines=OUTPUT_MAX_LINES)
+
+    def on_mount(self) -> None:
+        self._output = self.query_one("#model-output", RichLog)
+        self._selector = self.query_one(ModelSelector)
+        watch_path = Path(self.app.watch_path)
+        self._git_cwd = str(watch_path)
+        # The watcher only sees edits under watch_path, so the index/HEAD stamp
+        # is only a safe cache key when that's the repo root; otherwise use the TTL
+        git_dir = watch_path / ".git"
+        self._git_dir = git_dir if git_dir.is_dir() else None
 
     def toggle_shadow(self) -> None:
         """Toggle shadow review on/off."""
@@ -295,30 +640,80 @@ class ModelPanel(Vertical):
             btn.variant = "default"
             status.update("[dim]off[/]")
 
+    def invalidate_git_cache(self) -> None:
+        """Mark cached git output stale (working tree files changed)."""
+        # Keep output and digest so an unchanged refetch can skip the decode
+        for kind, entry in self._git_cache.items():
+            self._git_cache[kind] = entry._replace(stamp=None, fetched_at=float("-inf"))
+
+    async def _cached_git(self, kind: str, fetch_raw, empty: str) -> str:
+        """Run a git helper, reusing its output while .git/index and HEAD are unchanged."""
+        stamp = None
+        if self._git_dir is not None:
+            try:
+                # Staging touches the index; checkouts move HEAD
+                stamp = (
+                    (self._git_dir / "index").stat().st_mtime_ns,
+                    (self._git_dir / "HEAD").stat().st_mtime_ns,
+                )
+            except OSError:
+                pass
+
+        now = time.monotonic()
+        cached = self._git_cache.get(kind)
+        if cached is not None:
+            if stamp is not None:
+                if cached.stamp == stamp:
+                    return cached.output
+            elif now - cached.fetched_at < GIT_CACHE_TTL:
+                return cached.output
+
+        try:
+            raw = await fetch_raw(self._git_cwd)
+        except Exception as e:
+            return f"Error: {e}"
+
+        # Same bytes as last time - keep the decoded copy
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if cached is not None and cached.digest == digest:
+            output = cached.output
+        else:
+            output = decode_git_output(raw, empty)
+        self._git_cache[kind] = _GitCacheEntry(stamp, now, output, digest)
+        return output
+
+    async def _cached_diff(self) -> str:
+        return await self._cached_git("diff", get_git_diff_raw, "(no unstaged changes)")
+
+    async def _cached_staged(self) -> str:
+        return await self._cached_git("staged", get_git_staged_raw, "(nothing staged)")
+
     async def run_shadow_review(self) -> None:
         """Run an automatic review of the current diff."""
-        if not self.shadow_enabled or self._reviewing:
+        selector = self._selector
+        if not self.shadow_enabled or self._reviewing or selector is None:
             return
 
-        selector = self.query_one(ModelSelector)
-        client: LMStudioClient = self.app.lmstudio
+        client: "LMStudioClient" = self.app.lmstudio
 
         if not client.connected or not selector.selected_model:
             return
 
         # Get current diff
-        diff = get_git_diff()
+        kind = "diff"
+        diff = await self._cached_diff()
         if diff in ("(no unstaged changes)", "") or diff.startswith("Error:"):
             # Try staged changes instead
-            diff = get_git_staged()
+            kind = "staged"
+            diff = await self._cached_staged()
             if diff in ("(nothing staged)", "") or diff.startswith("Error:"):
                 return
 
-        # Check if diff changed since last review
-        diff_hash = hash(diff)
-        if diff_hash == self._last_diff_hash:
+        # Check if diff changed since last review (digest taken over git's raw bytes)
+        digest = (kind, self._git_cache[kind].digest)
+        if digest == self._last_diff_digest:
             return
-        self._last_diff_hash = diff_hash
+        self._last_diff_digest = digest
 
         # Run the review
         self._reviewing = True
@@ -335,24 +730,28 @@ If there are issues, list them in 1-2 sentences max.
 Start your response with one of: [SAFE], [WARNING], or [CRITICAL]"""
 
         # Stream the review
-        response = ""
-        async for token in client.query_chat_stream(
-            prompt=review_prompt,
-            context=diff,
-            model=selector.selected_model,
-        ):
-            response += token
-
-        self._reviewing = False
+        parts: list[str] = []
+        try:
+            async for token in client.query_chat_stream(
+                prompt=review_prompt,
+                context=diff,
+                model=selector.selected_model,
+            ):
+                parts.append(token)
+        finally:
+            self._reviewing = False
+        response = "".join(parts)
 
         # Determine status from response
+        match = _TAG_RE.match(response)
+        tag = match.group(1).upper() if match else "SAFE"
         if response.startswith("Error:"):
             review_status = "error"
             indicator = "[red]ERR[/]"
-        elif "[CRITICAL]" in response.upper():
+        elif tag == "CRITICAL":
             review_status = "critical"
             indicator = "[red bold]CRITICAL[/]"
-        elif "[WARNING]" in response.upper():
+        elif tag == "WARNING":
             review_status = "warning"
             indicator = "[yellow]WARN[/]"
         else:
@@ -368,13 +767,19 @@ Start your response with one of: [SAFE], [WARNING], or [CRITICAL]"""
         if event.button.id == "btn-refresh-models":
             return
 
-        output = self.query_one("#model-output", RichLog)
+        output = self._output
+        if output is None:
+            return
 
         # Handle Copy button separately
         if event.button.id == "btn-copy":
             if self.last_output:
-                subprocess.run(["clip"], input=self.last_output.encode(), check=True)
-                output.write("[green]Copied to clipboard[/]")
+                try:
+                    await asyncio.to_thread(clipboard.set_text, self.last_output)
+                except OSError:
+                    output.write("[red]Copy failed[/]")
+                else:
+                    output.write("[green]Copied to clipboard[/]")
             else:
                 output.write("[yellow]Nothing to copy[/]")
             return
@@ -384,8 +789,11 @@ Start your response with one of: [SAFE], [WARNING], or [CRITICAL]"""
             self.toggle_shadow()
             return
 
-        selector = self.query_one(ModelSelector)
-        client: LMStudioClient = self.app.lmstudio
+        if event.button.id not in _BUTTON_DISPATCH:
+            return
+
+        selector = self._selector
+        client: "LMStudioClient" = self.app.lmstudio
 
         if not client.connected:
             await selector.refresh_models(force=True)
@@ -398,47 +806,73 @@ Start your response with one of: [SAFE], [WARNING], or [CRITICAL]"""
             output.write("[yellow]No model selected[/]")
             return
 
-        output.clear()
-        output.write("[dim]Thinking...[/]")
-
-        if event.button.id == "btn-ping":
-            context = ""
-            prompt = "Reply with exactly: pong"
+        # Coalesce repeat presses into the request already in flight; a
+        # different request supersedes it.
+        key = (event.button.id, selector.selected_model)
+        worker = self._query_worker
+        if worker is not None and not worker.is_finished and key == self._query_key:
+            return
+        self._query_key = key
+        # exclusive cancels whichever query is still streaming
+        self._query_worker = self.run_worker(
+            self._run_query(event.button.id, selector.selected_model),
+            exclusive=True,
+            group="query",
+        )
 
-        elif event.button.id == "btn-diff":
-            context = get_git_diff()
-            prompt = "Explain what this diff does. Be concise."
+    async def _run_query(self, button_id: str, model: str) -> None:
+        """Gather context for a button and stream the model's reply."""
+        client: "LMStudioClient" = self.app.lmstudio
+        output = self._output
 
-        elif event.button.id == "btn-staged":
-            context = get_git_staged()
-            prompt = "Summarize these staged changes. What's the intent?"
+        prompt, get_context = _BUTTON_DISPATCH[button_id]
 
-        elif event.button.id == "btn-commit":
-            context = get_git_staged()
-            if context == "(nothing staged)":
-                context = get_git_diff()
-            prompt = "Suggest a commit message for these changes. Just the message, no explanation."
+        output.clear()
+        output.write("[dim]Thinking...[/]")
 
-        else:
-            return
+        context = await get_context(self)
 
-        # Stream response token by token
+        # Stream response, redrawing at most every OUTPUT_REDRAW_INTERVAL
         output.clear()
-        full_response = ""
-        async for token in client.query_chat_stream(
-            prompt=prompt,
-            context=context,
-            model=selector.selected_model,
-        ):
-            full_response += token
+        parts: list[str] = []
+        last_draw = 0.0
+        trailing: Timer | None = None
+
+        def draw() -> None:
+            nonlocal last_draw, trailing
+            trailing = None
+            last_draw = time.monotonic()
             output.clear()
-            output.write(full_response)
+            output.write("".join(parts))
+
+        try:
+            async for token in client.query_chat_stream(
+                prompt=prompt,
+                context=context,
+                model=model,
+            ):
+                parts.append(token)
+                wait = last_draw + OUTPUT_REDRAW_INTERVAL - time.monotonic()
+                if wait <= 0:
+                    if trailing is not None:
+                        trailing.stop()
+                    draw()
+                elif trailing is None:
+                    # Throttled - still draw this tail if the model pauses next
+                    trailing = self.set_timer(wait, draw)
+        finally:
+            # Superseded or done; a late redraw would clobber the next output
+            if trailing is not None:
+                trailing.stop()
+        full_response = "".join(parts)
+        output.clear()
+        output.write(full_response)
         self.last_output = full_response
 
     def on_model_panel_shadow_review_complete(self, event: ShadowReviewComplete) -> None:
         """Handle shadow review completion - show in output if critical/warning."""
-        if event.status in ("critical", "warning"):
-            output = self.query_one("#model-output", RichLog)
+        if event.status in ("critical", "warning") and self._output is not None:
+            output = self._output
             output.clear()
             output.write(f"[bold]Shadow Review:[/]\n{event.result}")
             self.last_output = event.result
@@ -452,12 +886,17 @@ class WorkspacePanel(App):
     def __init__(self, *args, watch_path: str = STARTING_PATH, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.watch_path = watch_path
+        from services.lm_studio import LMStudioClient
+        from services.mcp_client import McpClient
         self.lmstudio = LMStudioClient(
             base_url=os.environ.get("LMSTUDIO_BASE_URL", "http://127.0.0.1:1234/v1"),
             api_key=os.environ.get("LMSTUDIO_API_KEY"),
         )
+        self.mcp = McpClient()
         self.file_watcher = FileWatcher(watch_path)
         self._last_shadow_review = 0.0
+        self._pending_reload_at: float | None = None
+        self._pending_reload_dirs: set[str] = set()
 
     CSS = """
     Screen {
@@ -650,7 +1089,7 @@ class WorkspacePanel(App):
         background: #30363d;
     }
 
-    #resource-scroll {
+    #resource-content {
         height: 1fr;
         background: #0d1117;
         border: solid #333333;
@@ -658,10 +1097,6 @@ class WorkspacePanel(App):
         padding: 1;
     }
 
-    #resource-content {
-        width: 100%;
-    }
-
     /* Shadow review */
     .separator {
         width: 1;
@@ -702,32 +1137,104 @@ class WorkspacePanel(App):
         yield ModelPanel()
 
     def on_mount(self) -> None:
-        """Start file change polling on mount."""
-        self.set_interval(FILE_POLL_INTERVAL, self._check_for_file_changes)
+        """Start reacting to file changes on mount."""
+        self.run_worker(self._watch_files(), exclusive=True)
 
-    def on_unmount(self) -> None:
-        """Stop file watcher on exit."""
+    async def on_unmount(self) -> None:
+        """Stop file watcher and close service connections on exit."""
         self.file_watcher.stop()
+        await self.lmstudio.close()
+        await self.mcp.aclose()
+
+    async def _watch_files(self) -> None:
+        """Wait for watchdog events, coalescing each burst into one update."""
+        await asyncio.to_thread(self.file_watcher.start)
+        while True:
+            await self.file_watcher.wait_for_changes()
+            await asyncio.sleep(FILE_EVENT_COALESCE)
+            await self._check_for_file_changes()
 
     async def _check_for_file_changes(self) -> None:
-        """Poll for file changes and refresh tree if needed."""
+        """Drain file changes and refresh tree if needed."""
         changed, added, modified, deleted = self.file_watcher.check_for_changes()
+        model_panel = self.query_one(ModelPanel)
+
+        # Edited files make any cached diff stale - including ones under
+        # ignored directories, which a repo may still track (e.g. dist/)
+        if self.file_watcher.take_ignored_change() or changed:
+            model_panel.invalidate_git_cache()
 
         if changed:
-            # Refresh the file tree
-            tree = self.query_one("#file-tree", DirectoryTree)
-            tree.reload()
+            # Refresh the affected directories once the burst is over;
+            # content edits don't change the listing
+            if added or deleted:
+                self._pending_reload_dirs.update(os.path.dirname(p) for p in added + deleted)
+                self._schedule_tree_reload()
 
             # Trigger shadow review if enabled and cooldown passed
-            model_panel = self.query_one(ModelPanel)
             now = time.monotonic()
             if (model_panel.shadow_enabled and
                 now - self._last_shadow_review >= SHADOW_REVIEW_COOLDOWN):
                 self._last_shadow_review = now
-                await model_panel.run_shadow_review()
+                # On its own worker, so the watcher keeps draining (and
+                # invalidating the git cache) while the reply streams
+                model_panel.run_worker(model_panel.run_shadow_review(), group="shadow")
+
+    def _schedule_tree_reload(self) -> None:
+        """Push the pending tree reload out; arm the timer if none is pending."""
+        first = self._pending_reload_at is None
+        self._pending_reload_at = time.monotonic() + TREE_RELOAD_DEBOUNCE
+        if first:
+            self.set_timer(TREE_RELOAD_DEBOUNCE, self._maybe_reload)
+
+    def _maybe_reload(self) -> None:
+        """Reload the tree if no change has arrived since, else wait out the rest."""
+        if self._pending_reload_at is None:
+            return
+        remaining = self._pending_reload_at - time.monotonic()
+        if remaining > 0:
+            self.set_timer(remaining, self._maybe_reload)
+            return
+        self._pending_reload_at = None
+        dirs, self._pending_reload_dirs = self._pending_reload_dirs, set()
+        tree = self.query_one("#file-tree", DirectoryTree)
+        if len(dirs) > TREE_PARTIAL_RELOAD_MAX:
+            tree.reload()
+            return
+        for node in self._nodes_to_reload(tree, dirs):
+            tree.reload_node(node)
+
+    @staticmethod
+    def _nodes_to_reload(tree: DirectoryTree, dirs: set[str]) -> list[TreeNode]:
+        """Map changed directories to the loaded tree nodes whose listings are stale."""
+        # Only loaded directories have children, so this walks what's on screen
+        nodes: dict[Path, TreeNode] = {}
+        stack = [tree.root]
+        while stack:
+            node = stack.pop()
+            if node.allow_expand and node.data is not None:
+                nodes[node.data.path] = node
+            stack.extend(node.children)
+
+        root = tree.root.data.path
+        targets: dict[Path, TreeNode] = {}
+        for d in dirs:
+            # A new directory shows up in its nearest listed ancestor; a removed
+            # one disappears from its parent
+            path = Path(d)
+            while path != root and path.parent != path and (path not in nodes or not path.is_dir()):
+                path = path.parent
+            node = nodes.get(path)
+            if node is not None and node.data.loaded:
+                targets[path] = node
+
+        # Reloading a directory re-reads its expanded subdirectories too
+        return [node for path, node in targets.items() if not any(p in targets for p in path.parents)]
 
     def action_refresh(self) -> None:
         """Refresh the file tree."""
+        self._pending_reload_at = None
+        self._pending_reload_dirs.clear()
         tree = self.query_one("#file-tree", DirectoryTree)
         tree.reload()
 
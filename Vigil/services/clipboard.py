@@ -0,0 +1,96 @@
+"""Clipboard access without shelling out on Windows."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+import time
+from functools import cache
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    _OPEN_ATTEMPTS = 5  # another process may briefly hold the clipboard
+
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    # Explicit signatures: handles are pointer-sized and would be truncated as c_int
+    _user32.OpenClipboard.argtypes = [wintypes.HWND]
+    _user32.OpenClipboard.restype = wintypes.BOOL
+    _user32.EmptyClipboard.argtypes = []
+    _user32.EmptyClipboard.restype = wintypes.BOOL
+    _user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    _user32.SetClipboardData.restype = wintypes.HANDLE
+    _user32.CloseClipboard.argtypes = []
+    _user32.CloseClipboard.restype = wintypes.BOOL
+    _kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    _kernel32.GlobalAlloc.restype = ctypes.c_void_p
+    _kernel32.GlobalLock.argtypes = [ctypes.c_void_p]
+    _kernel32.GlobalLock.restype = ctypes.c_void_p
+    _kernel32.GlobalUnlock.argtypes = [ctypes.c_void_p]
+    _kernel32.GlobalUnlock.restype = wintypes.BOOL
+    _kernel32.GlobalFree.argtypes = [ctypes.c_void_p]
+    _kernel32.GlobalFree.restype = ctypes.c_void_p
+
+    def _last_error() -> OSError:
+        return ctypes.WinError(ctypes.get_last_error())
+
+    def set_text(text: str) -> None:
+        """Put text on the clipboard as CF_UNICODETEXT. Raises OSError on failure."""
+        data = text.encode("utf-16-le") + b"\0\0"
+        handle = _kernel32.GlobalAlloc(GMEM_MOVEABLE, len(data))
+        if not handle:
+            raise _last_error()
+        ptr = _kernel32.GlobalLock(handle)
+        if not ptr:
+            error = _last_error()
+            _kernel32.GlobalFree(handle)
+            raise error
+        ctypes.memmove(ptr, data, len(data))
+        _kernel32.GlobalUnlock(handle)
+
+        for _ in range(_OPEN_ATTEMPTS):
+            if _user32.OpenClipboard(None):
+                break
+            time.sleep(0.01)
+        else:
+            error = _last_error()
+            _kernel32.GlobalFree(handle)
+            raise error
+
+        try:
+            _user32.EmptyClipboard()
+            # On success the clipboard owns the memory; on failure we still do
+            if not _user32.SetClipboardData(CF_UNICODETEXT, handle):
+                error = _last_error()
+                _kernel32.GlobalFree(handle)
+                raise error
+        finally:
+            _user32.CloseClipboard()
+
+else:
+    _COMMANDS = (
+        ("pbcopy",),
+        ("wl-copy",),
+        ("xclip", "-selection", "clipboard"),
+        ("xsel", "--clipboard", "--input"),
+    )
+
+    @cache
+    def _find_command() -> tuple[str, ...] | None:
+        return next((cmd for cmd in _COMMANDS if shutil.which(cmd[0])), None)
+
+    def set_text(text: str) -> None:
+        """Put text on the clipboard via the platform's copy tool. Raises OSError on failure."""
+        cmd = _find_command()
+        if cmd is None:
+            raise OSError("No clipboard command found (pbcopy, wl-copy, xclip or xsel)")
+        try:
+            subprocess.run(cmd, input=text.encode("utf-8"), check=True, timeout=5)
+        except subprocess.SubprocessError as e:
+            raise OSError(f"{cmd[0]} failed: {e}") from e
@@ -0,0 +1,26 @@
+"""JSON helpers that use orjson when it's installed, stdlib json otherwise."""
+
+from __future__ import annotations
+
+try:  # Optional: orjson's C parser is much faster on large payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError (and ValueError)
+    JSONDecodeError = orjson.JSONDecodeError
+    loads = orjson.loads  # accepts str or bytes
+
+    def dumps_pretty(data) -> str:
+        """Two-space indented JSON."""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+else:
+    import json
+
+    JSONDecodeError = json.JSONDecodeError
+    loads = json.loads  # accepts str or bytes
+
+    def dumps_pretty(data) -> str:
+        """Two-space indented JSON."""
+        return json.dumps(data, indent=2)
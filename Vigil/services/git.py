@@ -1,44 +1,61 @@
-import subprocess
+import asyncio
 
+GIT_TIMEOUT = 10  # seconds
 
-def get_git_diff() -> str:
+
+async def _run_git(*args: str, cwd: str | None = None) -> bytes:
+    """Run git (in cwd, default the process's) without blocking the event loop and return its raw stdout."""
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+    )
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout=GIT_TIMEOUT)
+    except BaseException:
+        # Timed out or cancelled - don't leave git running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return out
+
+
+def decode_git_output(out: bytes, empty: str) -> str:
+    """Decode raw git output, substituting a placeholder when there is none."""
+    return out.decode("utf-8", errors="replace") or empty
+
+
+async def get_git_diff_raw(cwd: str | None = None) -> bytes:
+    """Get unstaged changes as undecoded output. Raises on failure."""
+    return await _run_git("diff", cwd=cwd)
+
+
+async def get_git_staged_raw(cwd: str | None = None) -> bytes:
+    """Get staged changes as undecoded output. Raises on failure."""
+    return await _run_git("diff", "--cached", cwd=cwd)
+
+
+async def get_git_diff(cwd: str | None = None) -> str:
     """Get unstaged changes."""
     try:
-        result = subprocess.run(
-            ["git", "diff"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        return result.stdout or "(no unstaged changes)"
+        return decode_git_output(await get_git_diff_raw(cwd), "(no unstaged changes)")
     except Exception as e:
         return f"Error: {e}"
 
 
-def get_git_staged() -> str:
+async def get_git_staged(cwd: str | None = None) -> str:
     """Get staged changes."""
     try:
-        result = subprocess.run(
-            ["git", "diff", "--cached"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        return result.stdout or "(nothing staged)"
+        return decode_git_output(await get_git_staged_raw(cwd), "(nothing staged)")
     except Exception as e:
         return f"Error: {e}"
 
 
-def get_git_log(n: int = 5) -> str:
+async def get_git_log(n: int = 5, cwd: str | None = None) -> str:
     """Get recent commit log."""
     try:
-        result = subprocess.run(
-            ["git", "log", f"-{n}", "--oneline"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        return result.stdout or "(no commits)"
+        return decode_git_output(await _run_git("log", f"-{n}", "--oneline", cwd=cwd), "(no commits)")
     except Exception as e:
         return f"Error: {e}"
-
@@ -1,16 +1,65 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import importlib.util
 import os
 import time
 from collections.abc import AsyncIterator
+from typing import NamedTuple
 from urllib.parse import urlparse, urlunparse
 
 import httpx
 
+from . import fastjson
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); httpx only negotiates it
+# over https, so plain-http LM Studio stays on keep-alive HTTP/1.1 either way
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Yield the payload of each SSE `data:` line as raw bytes."""
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        if b"\n" not in chunk:
+            continue
+        # Scan in place and copy out only data payloads - comments, event: and
+        # keepalive lines are skipped without allocating anything
+        start = 0
+        with memoryview(buffer) as view:
+            while (end := buffer.find(b"\n", start)) != -1:
+                if buffer.startswith(b"data:", start):
+                    yield bytes(view[start + 5:end]).strip()
+                start = end + 1
+        del buffer[:start]
+    if buffer.startswith(b"data:"):
+        yield bytes(buffer[5:].strip())
+
+
+# Shared by every request payload - never mutate it. (A MappingProxyType would
+# guard that, but httpx's json encoder only serializes real dicts.)
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": "You are a concise assistant helping with git operations. Be brief and direct.",
+}
+
+
+class _ApiRoot(NamedTuple):
+    """A candidate API root with its endpoint URLs built once."""
+
+    base_url: str
+    models_url: str
+    chat_url: str
+
 
 class LMStudioClient:
+    # Models probe: start the next candidate root when the current ones are
+    # this slow (or have failed), with at most this many in flight
+    _PROBE_STAGGER_S = 0.25
+    _PROBE_CONCURRENCY = 3
+    _PROBE_DEADLINE_S = 5.0  # whole race, so a hung server isn't waited on once per root
+
     def __init__(
         self,
         *,
@@ -19,15 +68,59 @@ class LMStudioClient:
         models_ttl_s: float = 15.0,
     ) -> None:
         self._base_url = base_url.rstrip("/")
-        self._api_key = api_key
         self._models_ttl_s = models_ttl_s
         self._refresh_lock = asyncio.Lock()
-
-        self.models: list[str] = []
+        self._http: httpx.AsyncClient | None = None
+        self._http_lock = asyncio.Lock()
+        # Every root worth probing, derived once from the configured URL
+        self._api_roots = tuple(
+            self._api_root(root) for root in self._build_candidate_api_roots(self._base_url)
+        )
+        self._candidates_cache: tuple[str, tuple[_ApiRoot, ...]] | None = None
+        # Resolved once; "lm-studio" is the conventional placeholder when no key is set
+        resolved_key = api_key or os.environ.get("LMSTUDIO_API_KEY") or "lm-studio"
+        self._auth_headers = {"Authorization": f"Bearer {resolved_key}"}
+
+        # Immutable, so readers can hold a reference while a refresh swaps in a new one
+        self.models: tuple[str, ...] = ()
         self.connected: bool = False
         self.last_error: str | None = None
         self._last_models_refresh_monotonic: float | None = None
 
+    async def __aenter__(self) -> LMStudioClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        # One pooled client keeps connections alive between calls
+        if self._http is None:
+            async with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.AsyncClient(
+                        # Sent on every request, so auth never costs a 401 round-trip
+                        headers=self._auth_headers,
+                        timeout=httpx.Timeout(60.0, connect=5.0),
+                        # The client's own limits/http2 are ignored once a transport is given
+                        transport=httpx.AsyncHTTPTransport(
+                            # One local host: a few sockets, kept warm across idle gaps between prompts
+                            limits=httpx.Limits(
+                                max_connections=8, max_keepalive_connections=4, keepalive_expiry=300.0
+                            ),
+                            http2=_HTTP2,
+                            retries=0,  # Candidate fallback handles failures; no hidden retry loop
+                        ),
+                    )
+        return self._http
+
+    async def close(self) -> None:
+        """Close the shared HTTP client (a later call opens a new one)."""
+        http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
+
     @property
     def models_url(self) -> str:
         return f"{self._base_url}/models"
@@ -36,9 +129,27 @@ class LMStudioClient:
     def chat_completions_url(self) -> str:
         return f"{self._base_url}/chat/completions"
 
-    def _candidate_api_roots(self) -> list[str]:
-        """Return API root candidates (hosts + common LM Studio API paths)."""
-        parsed = urlparse(self._base_url)
+    def _candidate_api_roots(self) -> tuple[_ApiRoot, ...]:
+        """Return API root candidates, the last one that answered first."""
+        # _base_url is moved to whichever root last succeeded; reorder only when it moves
+        cached = self._candidates_cache
+        if cached is not None and cached[0] == self._base_url:
+            return cached[1]
+        preferred = self._base_url
+        first = next((root for root in self._api_roots if root.base_url == preferred), None)
+        if first is None:
+            first = self._api_root(preferred)
+        candidates = (first, *(root for root in self._api_roots if root is not first))
+        self._candidates_cache = (preferred, candidates)
+        return candidates
+
+    def _api_root(self, base_url: str) -> _ApiRoot:
+        return _ApiRoot(base_url, self._models_url_for(base_url), self._chat_completions_url_for(base_url))
+
+    @staticmethod
+    def _build_candidate_api_roots(base_url: str) -> tuple[str, ...]:
+        """Build API root candidates (hosts + common LM Studio API paths)."""
+        parsed = urlparse(base_url)
         scheme = parsed.scheme or "http"
         hostname = parsed.hostname or "127.0.0.1"
         port = parsed.port
@@ -68,11 +179,13 @@ class LMStudioClient:
                 netloc = f"{host}:{port}"
             return urlunparse((scheme, netloc, clean_path, "", "", "")).rstrip("/")
 
+        # Path-major, so every host's configured path is tried before any alternate
+        # path - a hung host then can't fill the probe race with its own variants
         candidates: list[str] = []
-        for host in host_candidates:
-            for api_path in path_candidates:
+        for api_path in path_candidates:
+            for host in host_candidates:
                 candidates.append(build(host, api_path.rstrip("/")))
-        return list(dict.fromkeys(candidates))
+        return tuple(dict.fromkeys(candidates))
 
     def _models_url_for(self, base_url: str) -> str:
         return f"{base_url.rstrip('/')}/models"
@@ -80,18 +193,12 @@ class LMStudioClient:
     def _chat_completions_url_for(self, base_url: str) -> str:
         return f"{base_url.rstrip('/')}/chat/completions"
 
-    def _auth_headers(self) -> dict[str, str]:
-        api_key = self._api_key or os.environ.get("LMSTUDIO_API_KEY")
-        if not api_key:
-            api_key = "lm-studio"
-        return {"Authorization": f"Bearer {api_key}"}
-
     def _models_stale(self) -> bool:
         if self._last_models_refresh_monotonic is None:
             return True
         return (time.monotonic() - self._last_models_refresh_monotonic) > self._models_ttl_s
 
-    async def refresh_models(self, *, force: bool = False) -> list[str]:
+    async def refresh_models(self, *, force: bool = False) -> tuple[str, ...]:
         if not force and not self._models_stale():
             return self.models
 
@@ -99,43 +206,21 @@ class LMStudioClient:
             if not force and not self._models_stale():
                 return self.models
 
+            client = await self._get_client()
             last_exception: Exception | None = None
-            for candidate_base_url in self._candidate_api_roots():
-                try:
-                    async with httpx.AsyncClient(timeout=5.0) as client:
-                        url = self._models_url_for(candidate_base_url)
-                        response = await client.get(url)
-                        if response.status_code in (401, 403):
-                            response = await client.get(url, headers=self._auth_headers())
-                        response.raise_for_status()
-                        data = response.json()
-                        items = data.get("data", []) if isinstance(data, dict) else data
-                        if not isinstance(items, list):
-                            items = []
-                        models: list[str] = []
-                        for item in items:
-                            if not isinstance(item, dict):
-                                continue
-                            model_id = item.get("id") or item.get("name") or item.get("model")
-                            if isinstance(model_id, str) and model_id:
-                                models.append(model_id)
-                        self.models = models
-                        self.connected = True
-                        self.last_error = None if self.models else "No models returned."
-                        self._last_models_refresh_monotonic = time.monotonic()
-                        self._base_url = candidate_base_url.rstrip("/")
-                        return self.models
-                except httpx.HTTPStatusError as e:
-                    last_exception = e
-                    continue
-                except httpx.ConnectError as e:
-                    last_exception = e
-                    continue
-                except Exception as e:
-                    last_exception = e
-                    break
-
-            self.models = []
+            try:
+                root, models = await self._race_model_probes(client)
+            except Exception as e:
+                last_exception = e
+            else:
+                self.models = models
+                self.connected = True
+                self.last_error = None if self.models else "No models returned."
+                self._last_models_refresh_monotonic = time.monotonic()
+                self._base_url = root.base_url
+                return self.models
+
+            self.models = ()
             self.connected = False
             self.last_error = (
                 "Can't connect to LM Studio. Is it running?"
@@ -151,37 +236,91 @@ class LMStudioClient:
             self._last_models_refresh_monotonic = time.monotonic()
             return self.models
 
-    async def query_chat(self, *, prompt: str, context: str, model: str | None) -> str:
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a concise assistant helping with git operations. Be brief and direct.",
-            },
-            {"role": "user", "content": f"{prompt}\n\n```\n{context}\n```"},
-        ]
-
+    async def _probe_models(self, client: httpx.AsyncClient, root: _ApiRoot) -> tuple[str, ...]:
+        """Fetch the model list from one candidate root."""
+        response = await client.get(root.models_url, timeout=5.0)
+        response.raise_for_status()
+        data = fastjson.loads(response.content)
+        items = data.get("data", []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return ()
+        return tuple(
+            model_id
+            for item in items
+            if isinstance(item, dict)
+            and isinstance(model_id := item.get("id") or item.get("name") or item.get("model"), str)
+            and model_id
+        )
+
+    async def _race_model_probes(self, client: httpx.AsyncClient) -> tuple[_ApiRoot, tuple[str, ...]]:
+        """Probe candidate roots Happy-Eyeballs style and return the first that answers.
+
+        The preferred root gets a head start; a dead host (e.g. broken IPv6
+        loopback) then costs one stagger interval instead of a full timeout.
+        Probes that stall past a stagger interval don't hold their slot, so
+        hung roots can't starve the rest of the list before the deadline.
+        Raises the last probe error if every candidate fails.
+        """
+        candidates = iter(self._candidate_api_roots())
+        running: dict[asyncio.Task, _ApiRoot] = {}
+        last_exception: Exception | None = None
+        stalled = False
+        try:
+            # One budget for the whole race, so stalled roots can't add up
+            async with asyncio.timeout(self._PROBE_DEADLINE_S):
+                while True:
+                    if stalled or len(running) < self._PROBE_CONCURRENCY:
+                        root = next(candidates, None)
+                        if root is not None:
+                            task = asyncio.create_task(self._probe_models(client, root))
+                            running[task] = root
+                    if not running:
+                        raise last_exception or RuntimeError("No API roots to probe.")
+
+                    done, _ = await asyncio.wait(
+                        running,
+                        timeout=self._PROBE_STAGGER_S,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    stalled = not done
+                    for task in done:
+                        root = running.pop(task)
+                        if task.exception() is None:
+                            return root, task.result()
+                        last_exception = task.exception()
+        except TimeoutError:
+            raise TimeoutError("LM Studio didn't respond in time.") from last_exception
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    @staticmethod
+    def _build_payload(prompt: str, context: str, model: str | None, *, stream: bool) -> dict:
+        """Build the chat completion request body."""
         payload: dict = {
-            "messages": messages,
+            "messages": [_SYSTEM_MSG, {"role": "user", "content": f"{prompt}\n\n```\n{context}\n```"}],
             "temperature": 0.3,
             "max_tokens": 500,
-            "stream": False,
+            "stream": stream,
         }
-
         if model:
             payload["model"] = model
+        return payload
+
+    async def query_chat(self, *, prompt: str, context: str, model: str | None) -> str:
+        payload = self._build_payload(prompt, context, model, stream=False)
 
+        client = await self._get_client()
         last_exception: Exception | None = None
-        for candidate_base_url in self._candidate_api_roots():
+        for root in self._candidate_api_roots():
             try:
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    url = self._chat_completions_url_for(candidate_base_url)
-                    response = await client.post(url, json=payload)
-                    if response.status_code in (401, 403):
-                        response = await client.post(url, json=payload, headers=self._auth_headers())
-                    response.raise_for_status()
-                    data = response.json()
-                    self._base_url = candidate_base_url.rstrip("/")
-                    return data["choices"][0]["message"]["content"]
+                response = await client.post(root.chat_url, json=payload)
+                response.raise_for_status()
+                data = fastjson.loads(response.content)
+                self._base_url = root.base_url
+                return data["choices"][0]["message"]["content"]
             except httpx.HTTPStatusError as e:
                 last_exception = e
                 continue
@@ -199,55 +338,80 @@ class LMStudioClient:
         return f"Error: {last_exception}" if last_exception is not None else "Error: Unknown error"
 
     async def query_chat_stream(
-        self, *, prompt: str, context: str, model: str | None
+        self, *, prompt: str, context: str, model: str | None, coalesce_ms: float = 16.0
     ) -> AsyncIterator[str]:
-        """Stream chat completion tokens as they arrive."""
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a concise assistant helping with git operations. Be brief and direct.",
-            },
-            {"role": "user", "content": f"{prompt}\n\n```\n{context}\n```"},
-        ]
-
-        payload: dict = {
-            "messages": messages,
-            "temperature": 0.3,
-            "max_tokens": 500,
-            "stream": True,
-        }
-
-        if model:
-            payload["model"] = model
-
+        """Stream chat completion tokens, joining any that arrive within coalesce_ms (0 disables).
+
+        Held-back text is flushed when the window closes, not when the next
+        token arrives, so a pause in generation never delays what came before it.
+        """
+        payload = self._build_payload(prompt, context, model, stream=True)
+
+        client = await self._get_client()
+        loop = asyncio.get_running_loop()
+        coalesce_s = coalesce_ms / 1000
+        # Tokens held back until coalesce_s has passed since the last yield
+        parts: list[str] = []
+        last_flush = 0.0
         last_exception: Exception | None = None
-        for candidate_base_url in self._candidate_api_roots():
+        for root in self._candidate_api_roots():
             try:
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    url = self._chat_completions_url_for(candidate_base_url)
-                    async with client.stream(
-                        "POST", url, json=payload, headers=self._auth_headers()
-                    ) as response:
-                        if response.status_code in (401, 403):
-                            continue
-                        response.raise_for_status()
-                        self._base_url = candidate_base_url.rstrip("/")
-
-                        async for line in response.aiter_lines():
-                            if not line.startswith("data: "):
+                async with client.stream("POST", root.chat_url, json=payload) as response:
+                    response.raise_for_status()
+                    self._base_url = root.base_url
+
+                    # Read through to EOF after [DONE] so the pooled connection is reusable
+                    done = False
+                    events = _iter_sse_data(response)
+                    # While tokens are held back, the next read runs as a task so
+                    # the window can expire (and flush) even if the model pauses
+                    pending: asyncio.Future | None = None
+                    try:
+                        while True:
+                            if parts:
+                                if pending is None:
+                                    pending = asyncio.ensure_future(anext(events))
+                                remaining = last_flush + coalesce_s - loop.time()
+                                if remaining > 0:
+                                    await asyncio.wait({pending}, timeout=remaining)
+                                if not pending.done():
+                                    yield "".join(parts)
+                                    parts.clear()
+                                    last_flush = loop.time()
+                                    continue
+                            try:
+                                data_bytes = await (pending if pending is not None else anext(events))
+                            except StopAsyncIteration:
+                                pending = None
+                                break
+                            pending = None
+                            if done:
+                                continue
+                            if data_bytes == b"[DONE]":
+                                done = True
                                 continue
-                            data_str = line[6:]  # Strip "data: " prefix
-                            if data_str.strip() == "[DONE]":
-                                return
                             try:
-                                data = json.loads(data_str)
+                                data = fastjson.loads(data_bytes)
                                 delta = data.get("choices", [{}])[0].get("delta", {})
                                 content = delta.get("content", "")
                                 if content:
-                                    yield content
-                            except json.JSONDecodeError:
+                                    parts.append(content)
+                                    now = loop.time()
+                                    if now - last_flush >= coalesce_s:
+                                        yield "".join(parts)
+                                        parts.clear()
+                                        last_flush = now
+                            except fastjson.JSONDecodeError:
                                 continue
-                        return
+                    finally:
+                        # Let an abandoned read finish unwinding before closing its generator
+                        if pending is not None:
+                            pending.cancel()
+                            await asyncio.gather(pending, return_exceptions=True)
+                        await events.aclose()
+                    if parts:
+                        yield "".join(parts)
+                    return
             except httpx.HTTPStatusError as e:
                 last_exception = e
                 continue
@@ -258,6 +422,8 @@ class LMStudioClient:
                 last_exception = e
                 break
 
+        if parts:
+            yield "".join(parts)
         if isinstance(last_exception, httpx.ConnectError):
             yield "Error: Can't connect to LM Studio. Is it running?"
         elif isinstance(last_exception, httpx.HTTPStatusError):
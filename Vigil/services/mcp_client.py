@@ -3,13 +3,17 @@ Generic MCP Client for connecting to any configured MCP server.
 Reads server config from .mcp.json and provides resource browsing.
 """
 
-import json
+import asyncio
+import time
+from datetime import timedelta
+from functools import cached_property
 from pathlib import Path
 from dataclasses import dataclass
 
-from pydantic import AnyUrl
-from mcp.client.stdio import stdio_client, StdioServerParameters
-from mcp.client.session import ClientSession
+from . import fastjson
+
+# The mcp SDK (and pydantic) is slow to import, so it's pulled in on first
+# connection - projects without a .mcp.json never pay for it.
 
 
 @dataclass
@@ -26,30 +30,114 @@ class McpServer:
     """Configuration for an MCP server."""
     name: str
     command: str
-    args: list[str]
+    args: tuple[str, ...]
     cwd: str | None = None
 
+    @cached_property
+    def params(self):
+        """StdioServerParameters for spawning this server, built once."""
+        from mcp.client.stdio import StdioServerParameters
+
+        return StdioServerParameters(command=self.command, args=list(self.args), cwd=self.cwd)
+
+
+REQUEST_TIMEOUT = timedelta(seconds=30)  # per RPC on a pooled session
+RESOURCE_LIST_TTL = 15.0  # seconds a server's resource listing is reused
+READ_CONCURRENCY = 8  # in-flight reads per read_resources call
+
+
+class _ServerSession:
+    """A long-lived stdio session to one server.
+
+    The mcp transports are anyio task groups, which must be entered and exited
+    from the same task - so a dedicated owner task holds them open until
+    close() rather than the first caller that happened to need the server.
+    """
+
+    def __init__(self, server: McpServer):
+        self._server = server
+        self._ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def alive(self) -> bool:
+        return not self._task.done()
+
+    async def _run(self) -> None:
+        from mcp.client.stdio import stdio_client
+        from mcp.client.session import ClientSession
+
+        try:
+            async with stdio_client(self._server.params) as (read, write):
+                async with ClientSession(read, write, read_timeout_seconds=REQUEST_TIMEOUT) as session:
+                    await session.initialize()
+                    self._ready.set_result(session)
+                    await self._closing.wait()
+        except asyncio.CancelledError:
+            # Closed mid-startup - waiters get an ordinary failure, not a
+            # cancellation they didn't ask for
+            if not self._ready.done():
+                self._ready.set_exception(ConnectionError("MCP session closed"))
+            raise
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+        finally:
+            if not self._ready.done():
+                self._ready.set_exception(ConnectionError("MCP session closed"))
+
+    async def session(self):
+        """Wait for the server to finish initializing and return its ClientSession."""
+        return await asyncio.shield(self._ready)
+
+    async def close(self) -> None:
+        self._closing.set()
+        if not self._ready.done():
+            # Still starting (or hung in initialize) - _run isn't waiting on
+            # _closing yet, so cancel it rather than sit out REQUEST_TIMEOUT
+            self._task.cancel()
+        try:
+            await self._task
+        except BaseException:
+            pass  # Shutting down anyway
+
 
 class McpClient:
     """Client for connecting to MCP servers."""
 
+    # cwd -> discovered .mcp.json, so repeat instantiations skip the upward walk
+    _config_path_cache: dict[Path, Path] = {}
+
     def __init__(self, config_path: Path | str | None = None):
         if config_path is None:
             self.config_path = self._find_config()
         else:
             self.config_path = Path(config_path)
         self.servers: dict[str, McpServer] = {}
+        # One spawned server process per name, reused across calls
+        self._sessions: dict[str, _ServerSession] = {}
+        self._session_locks: dict[str, asyncio.Lock] = {}
+        # server -> (fetched at, resources); only successful, non-empty listings
+        self._resources_cache: dict[str, tuple[float, list[McpResource]]] = {}
         self._load_config()
 
     def _find_config(self) -> Path:
         """Find .mcp.json in current directory or parents."""
-        current = Path.cwd()
+        cwd = Path.cwd()
+        cached = self._config_path_cache.get(cwd)
+        if cached is not None:
+            return cached
+        found = cwd / ".mcp.json"
+        current = cwd
         while current != current.parent:
             config = current / ".mcp.json"
             if config.exists():
-                return config
+                found = config
+                break
             current = current.parent
-        return Path.cwd() / ".mcp.json"
+        self._config_path_cache[cwd] = found
+        return found
 
     def _load_config(self) -> None:
         """Load server configurations from .mcp.json."""
@@ -57,14 +145,13 @@ class McpClient:
             return
 
         try:
-            with open(self.config_path) as f:
-                data = json.load(f)
+            data = fastjson.loads(self.config_path.read_bytes())
 
             for name, config in data.get("mcpServers", {}).items():
                 self.servers[name] = McpServer(
                     name=name,
                     command=config["command"],
-                    args=config.get("args", []),
+                    args=tuple(config.get("args", ())),
                     cwd=config.get("cwd"),
                 )
         except Exception:
@@ -74,63 +161,135 @@ class McpClient:
         """Get list of configured server names."""
         return list(self.servers.keys())
 
+    async def _get_session(self, server_name: str):
+        """Return a live session to a server, spawning it on first use."""
+        lock = self._session_locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            pooled = self._sessions.get(server_name)
+            if pooled is None or not pooled.alive:
+                if pooled is not None:
+                    await pooled.close()  # Already exited; just reap it
+                pooled = _ServerSession(self.servers[server_name])
+                self._sessions[server_name] = pooled
+        try:
+            return await pooled.session()
+        except Exception:
+            # The session itself failed to start; shut it down and forget it.
+            # (A cancelled caller lands outside this - the server keeps
+            # starting for the next one.)
+            if self._sessions.get(server_name) is pooled:
+                del self._sessions[server_name]
+            await pooled.close()
+            raise
+
+    async def _discard_session(self, server_name: str) -> None:
+        self._resources_cache.pop(server_name, None)  # A respawned server may list differently
+        pooled = self._sessions.pop(server_name, None)
+        if pooled is not None:
+            await pooled.close()
+
+    async def _call(self, server_name: str, request):
+        """Run request(session) on the pooled session, respawning a dead server once."""
+        from mcp.shared.exceptions import McpError
+        from mcp.types import CONNECTION_CLOSED
+
+        for attempt in range(2):
+            session = await self._get_session(server_name)
+            try:
+                return await request(session)
+            except McpError as e:
+                # A real error response from a healthy server - don't respawn it
+                if e.error.code != CONNECTION_CLOSED or attempt:
+                    raise
+            except Exception:
+                if attempt:
+                    raise
+            await self._discard_session(server_name)
+
+    async def aclose(self) -> None:
+        """Shut down every pooled server process."""
+        sessions, self._sessions = self._sessions, {}
+        self._resources_cache.clear()
+        await asyncio.gather(*(pooled.close() for pooled in sessions.values()))
+
     async def list_resources(self, server_name: str) -> list[McpResource]:
-        """Connect to a server and list its resources."""
+        """List a server's resources over its pooled session."""
         if server_name not in self.servers:
             return []
 
-        server = self.servers[server_name]
-        params = StdioServerParameters(
-            command=server.command,
-            args=server.args,
-            cwd=server.cwd,
-        )
+        cached = self._resources_cache.get(server_name)
+        if cached is not None and time.monotonic() - cached[0] < RESOURCE_LIST_TTL:
+            return list(cached[1])
 
         try:
-            async with stdio_client(params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    result = await session.list_resources()
-
-                    return [
-                        McpResource(
-                            uri=str(r.uri),
-                            name=r.name or str(r.uri),
-                            description=r.description or "",
-                            mime_type=r.mimeType,
-                        )
-                        for r in result.resources
-                    ]
+            result = await self._call(server_name, lambda session: session.list_resources())
+            resources = [
+                McpResource(
+                    uri=str(r.uri),
+                    name=r.name or str(r.uri),
+                    description=r.description or "",
+                    mime_type=r.mimeType,
+                )
+                for r in result.resources
+            ]
         except Exception as e:
             return []
+        if resources:
+            self._resources_cache[server_name] = (time.monotonic(), resources)
+        return list(resources)
+
+    def invalidate_resources(self, server_name: str) -> None:
+        """Drop a server's cached listing so the next list_resources refetches it."""
+        self._resources_cache.pop(server_name, None)
 
     async def read_resource(self, server_name: str, uri: str) -> str:
-        """Connect to a server and read a specific resource."""
+        """Read a specific resource over the server's pooled session."""
         if server_name not in self.servers:
             return f"Server not found: {server_name}"
 
-        server = self.servers[server_name]
-        params = StdioServerParameters(
-            command=server.command,
-            args=server.args,
-            cwd=server.cwd,
-        )
+        from pydantic import AnyUrl
 
         try:
-            async with stdio_client(params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    # Convert string URI to AnyUrl
-                    resource_uri = AnyUrl(uri)
-                    result = await session.read_resource(resource_uri)
-
-                    # Combine all content parts
-                    parts = []
-                    for content in result.contents:
-                        if hasattr(content, 'text'):
-                            parts.append(content.text)
-                        elif hasattr(content, 'blob'):
-                            parts.append(f"[Binary data: {len(content.blob)} bytes]")
-                    return "\n".join(parts)
+            # Convert string URI to AnyUrl
+            resource_uri = AnyUrl(uri)
+            result = await self._call(server_name, lambda session: session.read_resource(resource_uri))
+            return self._contents_to_text(result.contents)
         except Exception as e:
             return f"Error reading resource: {e}"
+
+    async def read_resources(self, server_name: str, uris: list[str]) -> list[str]:
+        """Read several resources concurrently over one session, in the order given."""
+        if server_name not in self.servers:
+            return [f"Server not found: {server_name}"] * len(uris)
+
+        from pydantic import AnyUrl
+
+        try:
+            session = await self._get_session(server_name)
+        except Exception as e:
+            return [f"Error reading resource: {e}"] * len(uris)
+
+        # Bounded so a long list doesn't flood a single-threaded server
+        limit = asyncio.Semaphore(READ_CONCURRENCY)
+
+        async def read(uri: str) -> str:
+            async with limit:
+                result = await session.read_resource(AnyUrl(uri))
+            return self._contents_to_text(result.contents)
+
+        results = await asyncio.gather(*(read(uri) for uri in uris), return_exceptions=True)
+        return [
+            f"Error reading resource: {r}" if isinstance(r, Exception) else r
+            for r in results
+        ]
+
+    @staticmethod
+    def _contents_to_text(contents) -> str:
+        """Combine all content parts of a read_resource result."""
+        parts = []
+        for content in contents:
+            if hasattr(content, 'text'):
+                parts.append(content.text)
+            elif hasattr(content, 'blob'):
+                parts.append(f"[Binary data: {len(content.blob)} bytes]")
+        return "\n".join(parts)